@@ -1,73 +1,539 @@
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True)
+def _barrett(x, mod, m, shift):
+    """
+    Barrett reduction of a nonnegative scalar x < 2^shift modulo mod.
+    m = 0 means the modulus is too wide for the int64 multiply-and-shift
+    and plain % is used instead.
+    """
+
+    if m == 0:
+        return x % mod
+
+    r = x - ((x * m) >> shift) * mod
+    if r >= mod:
+        r -= mod
+    if r >= mod:
+        r -= mod
+
+    return r
+
+
+@numba.njit(cache=True)
+def _ntt_kernel(a, zetas, mod, m, shift):
+    """
+    In-place forward negacyclic NTT over a single int64 polynomial,
+    compiled butterfly loop with Barrett-reduced twiddle products.
+    """
+
+    n = len(a)
+    k = 0
+
+    length = n // 2
+    while length >= 1:
+        for start in range(0, n, 2 * length):
+            k += 1
+            zeta = zetas[k]
+
+            for j in range(start, start + length):
+                t = _barrett(zeta * a[j + length], mod, m, shift)
+
+                hi = a[j] - t
+                if hi < 0:
+                    hi += mod
+
+                lo = a[j] + t
+                if lo >= mod:
+                    lo -= mod
+
+                a[j] = lo
+                a[j + length] = hi
+
+        length //= 2
+
+    return a
+
+
+@numba.njit(cache=True)
+def _intt_kernel(a, zetas, n_inv, mod, m, shift):
+    """
+    In-place inverse negacyclic NTT over a single int64 polynomial,
+    including the final scaling by n^-1.
+    """
+
+    n = len(a)
+    k = n
+
+    length = 1
+    while length < n:
+        for start in range(0, n, 2 * length):
+            k -= 1
+            zeta = mod - zetas[k]
+
+            for j in range(start, start + length):
+                diff = a[j] - a[j + length]
+                if diff < 0:
+                    diff += mod
+
+                lo = a[j] + a[j + length]
+                if lo >= mod:
+                    lo -= mod
+
+                a[j] = lo
+                a[j + length] = _barrett(diff * zeta, mod, m, shift)
+
+        length *= 2
+
+    for i in range(n):
+        a[i] = _barrett(a[i] * n_inv, mod, m, shift)
+
+    return a
+
+
+@numba.njit(cache=True)
+def _pointwise_mul(a, b, mod, m, shift):
+    """
+    Pointwise product of two NTT-domain polynomials with Barrett reduction.
+    """
+
+    out = np.empty(len(a), dtype=np.int64)
+
+    for i in range(len(a)):
+        out[i] = _barrett(a[i] * b[i], mod, m, shift)
+
+    return out
+
+
+@numba.njit(cache=True)
+def _fold_negacyclic(result, n, mod):
+    """
+    Folds a raw convolution modulo (X^n + 1) and reduces each coefficient
+    modulo mod.
+
+    Parameters:
+    - result: int64 array of raw convolution coefficients
+    - n: ring degree
+    - mod: coefficient modulus
+
+    Returns:
+    - reduced: int64 array of length n, each coefficient reduced modulo mod
+    """
+
+    reduced = np.zeros(n, dtype=np.int64)
+
+    for i in range(len(result)):
+        if (i // n) & 1:
+            reduced[i % n] = (reduced[i % n] - result[i]) % mod
+        else:
+            reduced[i % n] = (reduced[i % n] + result[i]) % mod
+
+    return reduced
+
+
+@numba.njit(cache=True)
+def _mul_schoolbook(p1, p2, n, mod):
+    """
+    Schoolbook convolution of p1 and p2 followed by reduction modulo
+    (X^n + 1), JIT-compiled to avoid CPython dispatch in the double loop.
+
+    Parameters:
+    - p1: int64 array of coefficients (first polynomial)
+    - p2: int64 array of coefficients (second polynomial)
+    - n: ring degree
+    - mod: coefficient modulus
+
+    Returns:
+    - reduced: int64 array of length n, each coefficient reduced modulo mod
+    """
+
+    result = np.zeros(len(p1) + len(p2) - 1, dtype=np.int64)
+
+    # Reduction is deferred to the fold below: each accumulator sums at most
+    # min(len(p1), len(p2)) products bounded by (mod - 1)^2, which stays far
+    # below the int64 range for any realistic ring size.
+    for i in range(len(p1)):
+        for j in range(len(p2)):
+            result[i + j] += p1[i] * p2[j]
+
+    return _fold_negacyclic(result, n, mod)
+
+
+@numba.njit(cache=True)
+def _mul_small(sparse, dense, n, mod):
+    """
+    Schoolbook convolution that skips the zero coefficients of `sparse`,
+    profitable when that operand has small support (e.g. CBD noise, where
+    about half the lanes vanish).
+
+    Parameters:
+    - sparse: int64 array of coefficients with few nonzero entries
+    - dense: int64 array of coefficients (second polynomial)
+    - n: ring degree
+    - mod: coefficient modulus
+
+    Returns:
+    - reduced: int64 array of length n, each coefficient reduced modulo mod
+    """
+
+    result = np.zeros(len(sparse) + len(dense) - 1, dtype=np.int64)
+
+    for i in range(len(sparse)):
+        c = sparse[i]
+        if c != 0:
+            for j in range(len(dense)):
+                result[i + j] += c * dense[j]
+
+    return _fold_negacyclic(result, n, mod)
+
+
 class RingPolynomOperations:
     def __init__(self, mod, n):
         self.mod = mod
         self.n = n
 
-    def add(self, p1, p2):
+        # NTT tables exist whenever n is a power of two and mod = 1 (mod 2n),
+        # i.e. Z_mod contains a primitive 2n-th root of unity (negacyclic case).
+        self.ntt_ready = n > 1 and (n & (n - 1)) == 0 and (mod - 1) % (2 * n) == 0
+
+        # Alternating +1/-1 signs for the (X^n + 1) fold in module(),
+        # computed with a bitmask and grown on demand. Two chunks cover
+        # the common case of a full-length convolution product.
+        self._fold_signs = 1 - 2 * (np.arange(2, dtype=np.int64) & 1)
+
+        # Barrett constant: x mod q = x - ((x * M) >> shift) * q up to two
+        # conditional subtractions, valid for 0 <= x < 2^shift. The shift
+        # covers products of two reduced coefficients (x < 2 * mod^2), and
+        # x * M itself stays below 2^(3b + 4) for a b-bit modulus, so the
+        # trick only fits in int64 for moduli up to 19 bits. Above that,
+        # M = 0 signals the reduction helpers to fall back to plain %.
+        self._barrett_shift = 2 * mod.bit_length() + 2
+        if 3 * mod.bit_length() + 4 <= 63:
+            self._barrett_m = (1 << self._barrett_shift) // mod
+        else:
+            self._barrett_m = 0
+
+        if self.ntt_ready:
+            try:
+                # Composite moduli can pass the 2n | mod - 1 gate while having
+                # no 2n-th root of unity (or no n^-1); such rings quietly keep
+                # the schoolbook path instead of failing construction.
+                psi = self._find_primitive_root(2 * n)
+                self.n_inv = pow(n, -1, mod)
+            except ValueError:
+                self.ntt_ready = False
+            else:
+                log_n = n.bit_length() - 1
+
+                bit_reversed = [
+                    int(format(i, f'0{log_n}b')[::-1], 2) for i in range(n)
+                ]
+
+                self.zetas = np.array(
+                    [pow(psi, bit_reversed[i], mod) for i in range(n)],
+                    dtype=np.int64,
+                )
+
+    def _find_primitive_root(self, order):
         """
-        Adds two polynomials p1 and p2 in Z_q[X] / (X^n + 1).
+        Finds an element of multiplicative order exactly `order` in Z_mod.
+
+        Parameters:
+        - order: desired order (must be a power of two dividing mod - 1)
+
+        Returns:
+        - root: integer of order `order` modulo self.mod
+        """
+
+        exponent = (self.mod - 1) // order
+
+        # For prime moduli a candidate works with probability about 1/2, so a
+        # short scan always succeeds; the cap keeps construction cheap for
+        # composite moduli where no such root exists at all.
+        for candidate in range(2, min(self.mod, 1000)):
+            root = pow(candidate, exponent, self.mod)
+            if pow(root, order // 2, self.mod) == self.mod - 1:
+                return root
+
+        raise ValueError(f"No primitive root of order {order} modulo {self.mod}")
+
+    def _barrett_reduce(self, x):
+        """
+        Reduces nonnegative coefficients modulo q without a division,
+        via the precomputed Barrett constant. Falls back to plain % for
+        moduli too wide for the int64 multiply-and-shift.
+
+        Parameters:
+        - x: int array with entries in [0, 2^shift), e.g. products of two
+          reduced coefficients
+
+        Returns:
+        - r: int array with entries in [0, q)
+        """
+
+        if self._barrett_m == 0:
+            return x % self.mod
+
+        r = x - ((x * self._barrett_m) >> self._barrett_shift) * self.mod
+        r -= self.mod * (r >= self.mod)
+        r -= self.mod * (r >= self.mod)
+
+        return r
+
+    def _ntt(self, poly):
+        """
+        Forward negacyclic NTT (iterative Cooley-Tukey butterflies over the
+        bit-reversed zeta table), vectorized along the last axis.
+
+        Parameters:
+        - poly: int array of shape (..., n) with coefficients in Z_q
+
+        Returns:
+        - a: int array of shape (..., n) in the NTT domain
+        """
+
+        a = np.array(poly, dtype=np.int64)
+
+        # Single polynomials go through the compiled scalar kernel; the
+        # sliced NumPy path below serves batched (..., n) inputs.
+        if a.ndim == 1:
+            return _ntt_kernel(a, self.zetas, self.mod,
+                               self._barrett_m, self._barrett_shift)
+
+        k = 0
+
+        length = self.n // 2
+        while length >= 1:
+            for start in range(0, self.n, 2 * length):
+                k += 1
+                zeta = self.zetas[k]
+
+                lo = a[..., start:start + length]
+                hi = a[..., start + length:start + 2 * length]
+
+                t = self._barrett_reduce(zeta * hi)
+
+                new_lo = lo + t
+                new_lo -= self.mod * (new_lo >= self.mod)
+
+                new_hi = lo - t
+                new_hi += self.mod * (new_hi < 0)
+
+                a[..., start:start + length] = new_lo
+                a[..., start + length:start + 2 * length] = new_hi
+
+            length //= 2
+
+        return a
+
+    def _intt(self, poly):
+        """
+        Inverse negacyclic NTT (iterative Gentleman-Sande butterflies,
+        undoing _ntt, including the final scaling by n^-1).
 
         Parameters:
-        - p1: list of coefficients (first polynomial)
-        - p2: list of coefficients (second polynomial)
+        - poly: int array of shape (..., n) in the NTT domain
 
         Returns:
-        - result: reduced polynomial representing (p1 + p2) mod (X^n + 1), coeff mod q
+        - a: int array of shape (..., n) with coefficients in Z_q
         """
 
-        max_len = max(len(p1), len(p2))
+        a = np.array(poly, dtype=np.int64)
+
+        if a.ndim == 1:
+            return _intt_kernel(a, self.zetas, self.n_inv, self.mod,
+                                self._barrett_m, self._barrett_shift)
+
+        k = self.n
+
+        length = 1
+        while length < self.n:
+            for start in range(0, self.n, 2 * length):
+                k -= 1
+                zeta = self.mod - self.zetas[k]
+
+                lo = a[..., start:start + length]
+                hi = a[..., start + length:start + 2 * length]
+
+                diff = lo - hi
+                diff += self.mod * (diff < 0)
+                new_hi = self._barrett_reduce(diff * zeta)
+
+                new_lo = lo + hi
+                new_lo -= self.mod * (new_lo >= self.mod)
+
+                a[..., start:start + length] = new_lo
+                a[..., start + length:start + 2 * length] = new_hi
+
+            length *= 2
+
+        return self._barrett_reduce(a * self.n_inv)
 
-        p1_extended = p1 + [0] * (max_len - len(p1))
-        p2_extended = p2 + [0] * (max_len - len(p2))
+    def add(self, p1, p2):
+        """
+        Adds two polynomials p1 and p2 in Z_q[X] / (X^n + 1).
+
+        Parameters:
+        - p1: int array or list of coefficients (first polynomial)
+        - p2: int array or list of coefficients (second polynomial)
 
-        result = [(a + b) % self.mod for a, b in zip(p1_extended, p2_extended)]
+        Returns:
+        - result: int array of length n representing (p1 + p2) mod (X^n + 1), coeff mod q
+        """
 
-        return self.module(result)
+        return (self.module(p1) + self.module(p2)) % self.mod
 
     def multiply(self, p1, p2):
         """
         Multiplies two polynomials p1 and p2 in Z_q[X] / (X^n + 1).
 
+        Uses the O(n log n) negacyclic NTT when the modulus supports it,
+        otherwise falls back to the schoolbook convolution.
+
+        Parameters:
+        - p1: int array or list of coefficients (first polynomial)
+        - p2: int array or list of coefficients (second polynomial)
+
+        Returns:
+        - result: int array of length n representing (p1 * p2) mod (X^n + 1), coeff mod q
+        """
+
+        if not self.ntt_ready:
+            a = np.asarray(p1, dtype=np.int64)
+            b = np.asarray(p2, dtype=np.int64)
+
+            # Route the sparser operand through the zero-skipping kernel
+            # when at least half of its coefficients vanish.
+            nonzero_a = np.count_nonzero(a)
+            nonzero_b = np.count_nonzero(b)
+
+            if nonzero_b < nonzero_a:
+                a, b = b, a
+                nonzero_a = nonzero_b
+
+            if 2 * nonzero_a <= len(a):
+                return self.multiply_small(a, b)
+
+            return self._multiply_schoolbook(a, b)
+
+        a = self._ntt(self.module(p1))
+        b = self._ntt(self.module(p2))
+
+        pointwise = _pointwise_mul(a, b, self.mod,
+                                   self._barrett_m, self._barrett_shift)
+
+        return self._intt(pointwise)
+
+    def negate(self, poly):
+        """
+        Negates a polynomial in Z_q[X] / (X^n + 1).
+
+        O(n) replacement for multiplying by the constant polynomial [-1].
+
+        Parameters:
+        - poly: int array or list of coefficients
+
+        Returns:
+        - result: int array of length n representing -poly, coeff mod q
+        """
+
+        return (-self.module(poly)) % self.mod
+
+    def multiply_accumulate(self, acc, p1, p2):
+        """
+        Accumulates the raw convolution p1 * p2 into acc in place.
+
+        Lets callers sum several products into one preallocated buffer and
+        defer the (X^n + 1) / mod q reduction to a single module() call.
+        acc must be int64 and long enough for the full convolution; the
+        deferred sums stay far below the int64 range for realistic rings.
+
+        Parameters:
+        - acc: int64 array accumulating raw convolution coefficients
+        - p1: int array or list of coefficients (first polynomial)
+        - p2: int array or list of coefficients (second polynomial)
+        """
+
+        product = np.convolve(
+            np.asarray(p1, dtype=np.int64),
+            np.asarray(p2, dtype=np.int64),
+        )
+
+        acc[:len(product)] += product
+
+    def multiply_small(self, sparse, dense):
+        """
+        Multiplies two polynomials, treating `sparse` as a small-support
+        operand whose zero coefficients are skipped entirely.
+
         Parameters:
-        - p1: list of coefficients (first polynomial)
-        - p2: list of coefficients (second polynomial)
+        - sparse: int array or list of coefficients with few nonzero entries
+        - dense: int array or list of coefficients (second polynomial)
 
         Returns:
-        - result: reduced polynomial representing (p1 * p2) mod (X^n + 1), coeff mod q
+        - result: int array of length n representing (sparse * dense) mod (X^n + 1), coeff mod q
         """
 
-        result_length = len(p1) + len(p2) - 1
-        result = [0] * result_length
+        return _mul_small(
+            np.asarray(sparse, dtype=np.int64),
+            np.asarray(dense, dtype=np.int64),
+            self.n,
+            self.mod,
+        )
 
-        for i, a in enumerate(p1):
-            for j, b in enumerate(p2):
-                result[i + j] = (result[i + j] + a * b) % self.mod
+    def _multiply_schoolbook(self, p1, p2):
+        """
+        Schoolbook convolution, kept as a fallback for rings whose modulus
+        is not NTT-friendly. Thin wrapper around the JIT-compiled
+        _mul_schoolbook kernel.
+
+        Parameters:
+        - p1: int array or list of coefficients (first polynomial)
+        - p2: int array or list of coefficients (second polynomial)
+
+        Returns:
+        - result: int array of length n representing (p1 * p2) mod (X^n + 1), coeff mod q
+        """
 
-        return self.module(result)
+        return _mul_schoolbook(
+            np.asarray(p1, dtype=np.int64),
+            np.asarray(p2, dtype=np.int64),
+            self.n,
+            self.mod,
+        )
 
     def module(self, poly):
         """
         Reduces a polynomial modulo (X^n + 1) and modulo q.
 
+        Coefficients beyond degree n - 1 wrap around with alternating signs
+        (X^n = -1); the fold is done as one vectorized chunked sum.
+
         Parameters:
-        - poly: list of coefficients representing the polynomial to be reduced
+        - poly: int array or list of coefficients representing the polynomial
 
         Returns:
-        - reduced: list of coefficients of degree < n, each reduced modulo q
+        - reduced: int array of length n, each coefficient reduced modulo q
         """
 
-        if len(poly) >= self.n:
-            reduced = poly[:self.n]
-        else:
-            reduced = poly + [0] * (self.n - len(poly))
+        poly = np.asarray(poly, dtype=np.int64)
+
+        if len(poly) <= self.n:
+            padded = np.zeros(self.n, dtype=np.int64)
+            padded[:len(poly)] = poly
+            return padded % self.mod
+
+        num_chunks = -(-len(poly) // self.n)
 
-        reduced = reduced[:self.n]
+        padded = np.zeros(num_chunks * self.n, dtype=np.int64)
+        padded[:len(poly)] = poly
 
-        for i in range(self.n, len(poly)):
-            coeff = poly[i]
-            power = i // self.n
-            rem = i % self.n
+        chunks = padded.reshape(num_chunks, self.n)
 
-            reduced[rem] = (reduced[rem] + (-1) ** power * coeff) % self.mod
+        if num_chunks > len(self._fold_signs):
+            self._fold_signs = 1 - 2 * (np.arange(num_chunks, dtype=np.int64) & 1)
+        signs = self._fold_signs[:num_chunks]
 
-        return [c % self.mod for c in reduced]
+        return (chunks * signs[:, None]).sum(axis=0) % self.mod
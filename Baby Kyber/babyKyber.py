@@ -1,5 +1,42 @@
-import math
-import secrets as sc
+import os
+
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True)
+def _cbd_from_bytes(random_bytes, n, eta):
+    """
+    Decodes CBD coefficients from a packed random byte buffer: coefficient i
+    is popcount(a) - popcount(b) over two consecutive eta-bit groups, read
+    most-significant bit first.
+
+    Parameters:
+    - random_bytes: uint8 array holding at least 2 * eta * n random bits
+    - n: number of coefficients
+    - eta: CBD parameter
+
+    Returns:
+    - coeffs: int64 array of n CBD samples centered around 0
+    """
+
+    coeffs = np.zeros(n, dtype=np.int64)
+    bit = 0
+
+    for i in range(n):
+        a = 0
+        for _ in range(eta):
+            a += (random_bytes[bit >> 3] >> (7 - (bit & 7))) & 1
+            bit += 1
+
+        b = 0
+        for _ in range(eta):
+            b += (random_bytes[bit >> 3] >> (7 - (bit & 7))) & 1
+            bit += 1
+
+        coeffs[i] = a - b
+
+    return coeffs
 
 
 class BabyKyber:
@@ -10,29 +47,143 @@ class BabyKyber:
         self.q = q
         self.ring = ring
 
+        # Lazily populated NTT transforms of the fixed key material,
+        # reused across encryptions/decryptions under the same key.
+        self._pk_ntt_cache = None
+        self._sk_ntt_cache = None
+
+        # A is immutable after key_gen, so its transpose is built once
+        # there instead of on every encrypt call.
+        self._A_T_cache = None
+
+        # Decoding window for decrypt: a coefficient maps to bit 1 iff it
+        # lies within _decode_radius of _decode_mid.
+        self._decode_mid = q // 2
+        self._decode_radius = q // 4
+
+        # ceil(q / 2), the scaling factor applied to message bits.
+        self._half_q = (q + 1) // 2
+
+    def _transposed(self, A, k):
+        """
+        Returns A^T, cached since A does not change after key_gen.
+
+        Parameters:
+        - A: public matrix of size k x k
+        - k: matrix dimension
+
+        Returns:
+        - A_T: transposed matrix of size k x k
+        """
+
+        cache = self._A_T_cache
+
+        if cache is None or cache[0] is not A:
+            cache = (A, [[A[j][i] for j in range(k)] for i in range(k)])
+            self._A_T_cache = cache
+
+        return cache[1]
+
+    def _public_key_ntt(self, A, t, k, ring):
+        """
+        Returns the NTT transforms of A^T and t, caching them on first use.
+
+        A and t are fixed after key_gen, so their forward transforms are
+        computed once and reused by every subsequent encryption.
+
+        Parameters:
+        - A: public matrix of size k x k
+        - t: public vector of size k
+        - k: matrix dimension
+        - ring: an instance of RingPolynomOperations
+
+        Returns:
+        - A_T_hat: int array of shape (k, k, n), NTT of the transposed matrix
+        - t_hat: int array of shape (k, n), NTT of the public vector
+        """
+
+        cache = self._pk_ntt_cache
+
+        if cache is None or cache[0] is not A:
+            A_T = self._transposed(A, k)
+            A_T_hat = np.stack([
+                np.stack([ring._ntt(ring.module(A_T[i][j])) for j in range(k)])
+                for i in range(k)
+            ])
+            t_hat = np.stack([ring._ntt(ring.module(t_i)) for t_i in t])
+
+            cache = (A, A_T_hat, t_hat)
+            self._pk_ntt_cache = cache
+
+        return cache[1], cache[2]
+
+    def _secret_key_ntt(self, s, ring):
+        """
+        Returns the NTT transform of the secret vector s, caching it on first use.
+
+        Parameters:
+        - s: secret key vector of size k
+        - ring: an instance of RingPolynomOperations
+
+        Returns:
+        - s_hat: int array of shape (k, n), NTT of the secret vector
+        """
+
+        cache = self._sk_ntt_cache
+
+        if cache is None or cache[0] is not s:
+            s_hat = np.stack([ring._ntt(ring.module(s_i)) for s_i in s])
+
+            cache = (s, s_hat)
+            self._sk_ntt_cache = cache
+
+        return cache[1]
+
     @staticmethod
     def sample_uniform_polynomial(q, degree):
         """
         Samples a uniform random polynomial in Z_q[X] with degree at most `degree`.
 
-        Each coefficient is sampled uniformly at random from the range [0, q - 1].
+        Each coefficient is sampled uniformly at random from the range [0, q - 1],
+        drawn from one bulk os.urandom buffer with vectorized rejection sampling
+        (values at or above the largest multiple of q below 2^32 are discarded)
+        instead of one CSPRNG call per coefficient.
 
         Parameters:
             q (int): The modulus of the polynomial ring (coefficients are in Z_q).
             degree (int): The maximum degree of the polynomial.
 
         Returns:
-            List[int]: A list of coefficients representing the polynomial, length (degree + 1).
+            np.ndarray: An int64 array of coefficients representing the polynomial, length (degree + 1).
         """
-        return [sc.randbelow(q) for _ in range(degree + 1)]
+
+        count = degree + 1
+        limit = (1 << 32) - ((1 << 32) % q)
+
+        coefficients = np.empty(count, dtype=np.int64)
+        filled = 0
+
+        while filled < count:
+            raw = np.frombuffer(
+                os.urandom(4 * (count - filled + 4)), dtype=np.uint32
+            ).astype(np.int64)
+
+            accepted = raw[raw < limit] % q
+            take = min(len(accepted), count - filled)
+
+            coefficients[filled:filled + take] = accepted[:take]
+            filled += take
+
+        return coefficients
 
     @staticmethod
     def sample_cbd_polynomial(n, eta, ring):
         """
         Samples a polynomial with coefficients from a centered binomial distribution (CBD).
 
-        Each coefficient is computed as the difference between two samples from a uniform
-        distribution over the integers in [0, eta]. The result is then reduced modulo (X^n + 1).
+        Each coefficient is popcount(a) - popcount(b) where a and b are eta random
+        bits, so it only takes one bulk draw of 2 * eta * n random bits per call.
+        The result is then reduced modulo (X^n + 1).
 
         Parameters:
             n (int): The number of coefficients in the polynomial (usually degree + 1).
@@ -40,18 +191,43 @@ class BabyKyber:
             ring (RingPolynomOperations): An instance that provides the module reduction for polynomials.
 
         Returns:
-            List[int]: A reduced polynomial of length `n` with coefficients in Z_q.
+            np.ndarray: A reduced int64 polynomial of length `n` with coefficients in Z_q.
         """
 
-        coefficients = []
+        num_bits = 2 * eta * n
+        random_bytes = np.frombuffer(os.urandom(-(-num_bits // 8)), dtype=np.uint8)
 
-        for _ in range(n):
-            a = sc.choice(range(eta + 1))  # uniform random in [0, eta]
-            b = sc.choice(range(eta + 1))  # uniform random in [0, eta]
-            coefficients.append(a - b)  # CBD sample: centered around 0
+        coefficients = _cbd_from_bytes(random_bytes, n, eta)  # centered around 0
 
         return ring.module(coefficients)
 
+    @staticmethod
+    def sample_cbd_tensor(shape, eta):
+        """
+        Samples a whole tensor of CBD coefficients with one bulk random draw.
+
+        Same popcount(a) - popcount(b) distribution as sample_cbd_polynomial,
+        for batched callers that need noise for many polynomials at once.
+        Coefficients are left centered around 0 (not reduced modulo q).
+
+        Parameters:
+            shape (tuple): The shape of the coefficient tensor to sample.
+            eta (int): The parameter controlling the noise distribution.
+
+        Returns:
+            np.ndarray: An int64 array of CBD samples with the given shape.
+        """
+
+        count = int(np.prod(shape))
+        num_bits = 2 * eta * count
+
+        random_bytes = np.frombuffer(os.urandom(-(-num_bits // 8)), dtype=np.uint8)
+        bits = np.unpackbits(random_bytes)[:num_bits]
+
+        popcounts = bits.reshape(count, 2, eta).sum(axis=2, dtype=np.int64)
+
+        return (popcounts[:, 0] - popcounts[:, 1]).reshape(shape)
+
     def key_gen(self, q, n, k, eta, ring):
         """
         Key Generation for Baby Kyber.
@@ -74,17 +250,21 @@ class BabyKyber:
             for _ in range(k)
         ]
 
+        self._transposed(A, k)
+
         s = [self.sample_cbd_polynomial(n, eta, ring) for _ in range(k)]
         e = [self.sample_cbd_polynomial(n, eta, ring) for _ in range(k)]
 
         t = []
         for i in range(k):
-            row_sum = [0]
+            # One accumulator per row, reduced once after the whole sum;
+            # 2n covers the convolution of the (n + 1)-coefficient A entries.
+            row_sum = np.zeros(2 * n, dtype=np.int64)
 
             for j in range(k):
-                row_sum = ring.add(row_sum, ring.multiply(A[i][j], s[j]))
+                ring.multiply_accumulate(row_sum, A[i][j], s[j])
 
-            t_i = ring.add(row_sum, e[i])
+            t_i = ring.add(ring.module(row_sum), e[i])
             t.append(t_i)
 
         return A, t, s
@@ -112,30 +292,139 @@ class BabyKyber:
         e1 = [self.sample_cbd_polynomial(n, eta, ring) for _ in range(k)]
         e2 = self.sample_cbd_polynomial(n, eta, ring)
 
-        A_T = [[A[j][i] for j in range(k)] for i in range(k)]
+        m_scaled = np.asarray(m_bits, dtype=np.int64) * self._half_q
+
+        if ring.ntt_ready:
+            # Only the fresh noise vector r needs a forward transform;
+            # A^T and t are served from the per-key NTT cache.
+            A_T_hat, t_hat = self._public_key_ntt(A, t, k, ring)
+            r_hat = np.stack([ring._ntt(r_j) for r_j in r])
+
+            u_hat = np.einsum('ijn,jn->in', A_T_hat, r_hat) % q
+            u = (ring._intt(u_hat) + np.stack(e1)) % q
+
+            v_hat = np.einsum('in,in->n', t_hat, r_hat) % q
+            v = (ring._intt(v_hat) + e2 + m_scaled) % q
+
+            return u, v
+
+        A_T = self._transposed(A, k)
 
         u = []
         for i in range(k):
-            row_sum = [0]
+            row_sum = np.zeros(2 * n, dtype=np.int64)
 
             for j in range(k):
-                row_sum = ring.add(row_sum, ring.multiply(A_T[i][j], r[j]))
+                ring.multiply_accumulate(row_sum, A_T[i][j], r[j])
 
-            u_i = ring.add(row_sum, e1[i])
+            u_i = ring.add(ring.module(row_sum), e1[i])
             u.append(u_i)
 
-        v = e2.copy()
-
+        row_sum = np.zeros(2 * n, dtype=np.int64)
         for i in range(k):
-            v = ring.add(v, ring.multiply(t[i], r[i]))
+            ring.multiply_accumulate(row_sum, t[i], r[i])
 
-        m_scaled = [coeff * math.ceil(q / 2) for coeff in m_bits]
+        v = ring.add(ring.module(row_sum), e2)
         v = ring.add(v, m_scaled)
 
         return u, v
 
-    @staticmethod
-    def decrypt(c, s, q, k, ring):
+    def encrypt_into(self, A, t, m_bits, q, n, k, eta, ring, out_u, out_v):
+        """
+        Encrypt a message and write the ciphertext into caller-provided buffers.
+
+        Lets tight experiment loops reuse one preallocated array across
+        rounds instead of allocating fresh ciphertext objects per call:
+        the final NTT-domain products land directly in out_u/out_v.
+
+        Parameters:
+        - A: public matrix of size k x k
+        - t: public vector of size k
+        - m_bits: message polynomial (list of bits, length n)
+        - q: modulus
+        - n: polynomial degree (number of coefficients per polynomial)
+        - k: matrix dimension
+        - eta: CBD parameter for noise generation
+        - ring: an instance of RingPolynomOperations
+        - out_u: int array of shape (k, n) receiving the ciphertext vector
+        - out_v: int array of shape (n,) receiving the ciphertext polynomial
+        """
+
+        if not ring.ntt_ready:
+            u, v = self.encrypt(A, t, m_bits, q, n, k, eta, ring)
+            np.copyto(out_u, u)
+            np.copyto(out_v, v)
+            return
+
+        r = [self.sample_cbd_polynomial(n, eta, ring) for _ in range(k)]
+        e1 = [self.sample_cbd_polynomial(n, eta, ring) for _ in range(k)]
+        e2 = self.sample_cbd_polynomial(n, eta, ring)
+
+        m_scaled = np.asarray(m_bits, dtype=np.int64) * self._half_q
+
+        A_T_hat, t_hat = self._public_key_ntt(A, t, k, ring)
+        r_hat = np.stack([ring._ntt(r_j) for r_j in r])
+
+        u_hat = np.einsum('ijn,jn->in', A_T_hat, r_hat) % q
+        np.add(ring._intt(u_hat), np.stack(e1), out=out_u)
+        out_u %= q
+
+        v_hat = np.einsum('in,in->n', t_hat, r_hat) % q
+        np.add(ring._intt(v_hat), e2, out=out_v)
+        out_v += m_scaled
+        out_v %= q
+
+    def encrypt_batch(self, A, t, M):
+        """
+        Encrypts a whole batch of message chunks with one vectorized pass.
+
+        All noise terms are sampled as single tensors and the k x k
+        matrix-vector products are evaluated in the NTT domain with one
+        einsum over the chunk axis, instead of one `encrypt` call (and its
+        Python loops) per chunk.
+
+        Parameters:
+        - A: public matrix of size k x k
+        - t: public vector of size k
+        - M: int array of shape (num_chunks, n), one message chunk of bits per row
+
+        Returns:
+        - U: int array of shape (num_chunks, k, n), ciphertext vectors
+        - V: int array of shape (num_chunks, n), ciphertext polynomials
+        """
+
+        q, n, k, eta, ring = self.q, self.n, self.k, self.eta, self.ring
+
+        M = np.asarray(M, dtype=np.int64)
+        num_chunks = len(M)
+
+        if not ring.ntt_ready:
+            U = np.zeros((num_chunks, k, n), dtype=np.int64)
+            V = np.zeros((num_chunks, n), dtype=np.int64)
+            for c in range(num_chunks):
+                u, v = self.encrypt(A, t, M[c], q, n, k, eta, ring)
+                U[c] = np.stack(u)
+                V[c] = v
+            return U, V
+
+        r = self.sample_cbd_tensor((num_chunks, k, n), eta)
+        e1 = self.sample_cbd_tensor((num_chunks, k, n), eta)
+        e2 = self.sample_cbd_tensor((num_chunks, n), eta)
+
+        # A^T and t are fixed across chunks: serve them from the per-key cache.
+        A_T_hat, t_hat = self._public_key_ntt(A, t, k, ring)
+
+        r_hat = ring._ntt(r % q)
+
+        U_hat = np.einsum('ijn,cjn->cin', A_T_hat, r_hat) % q
+        U = (ring._intt(U_hat) + e1) % q
+
+        V_hat = np.einsum('in,cin->cn', t_hat, r_hat) % q
+        V = (ring._intt(V_hat) + e2 + M * self._half_q) % q
+
+        return U, V
+
+    def decrypt(self, c, s, q, k, ring):
         """
         Decrypt a ciphertext (u, v) using the secret key s.
 
@@ -152,22 +441,21 @@ class BabyKyber:
 
         u, v = c
 
-        sTu = [0]
-        for i in range(k):
-            sTu = ring.add(sTu, ring.multiply(u[i], s[i]))
-
-        decrypted = ring.add(v, ring.multiply(sTu, [-1]))
+        if ring.ntt_ready:
+            # s is fixed across decryptions: serve its transform from the cache.
+            s_hat = self._secret_key_ntt(s, ring)
+            u_hat = np.stack([ring._ntt(ring.module(u_i)) for u_i in u])
 
-        m_decoded = []
-        for coeff in decrypted:
-            c_mod = coeff % ring.mod
+            sTu = ring._intt(np.einsum('in,in->n', s_hat, u_hat) % q)
+        else:
+            acc = np.zeros(2 * ring.n, dtype=np.int64)
+            for i in range(k):
+                ring.multiply_accumulate(acc, ring.module(u[i]), s[i])
+            sTu = ring.module(acc)
 
-            lower_bound = (q // 2) - (q // 4)
-            upper_bound = (q // 2) + (q // 4)
+        decrypted = ring.add(v, ring.negate(sTu))
 
-            if lower_bound <= c_mod <= upper_bound:
-                m_decoded.append(1)
-            else:
-                m_decoded.append(0)
+        coeffs = np.mod(np.asarray(decrypted), ring.mod)
+        m_decoded = (np.abs(coeffs - self._decode_mid) <= self._decode_radius).astype(np.int8)
 
-        return m_decoded
+        return m_decoded.tolist()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from RingPolynom import RingPolynomOperations
 from babyKyber import BabyKyber
 
@@ -15,11 +17,7 @@ def text_to_bits(text):
 
     byte_data = text.encode('utf-8')
 
-    bits = []
-    for c in byte_data:
-        bits.extend([(c >> i) & 1 for i in reversed(range(8))])
-
-    return bits
+    return np.unpackbits(np.frombuffer(byte_data, dtype=np.uint8)).tolist()
 
 
 def bits_to_text(bits):
@@ -33,20 +31,12 @@ def bits_to_text(bits):
     - text: UTF-8 decoded string reconstructed from bits
     """
 
-    bytes_list = []
+    arr = np.asarray(bits, dtype=np.uint8)
 
-    for i in range(0, len(bits), 8):
-        byte_bits = bits[i:i + 8]
-        if len(byte_bits) < 8:
-            byte_bits += [0] * (8 - len(byte_bits))
+    if len(arr) % 8:
+        arr = np.concatenate([arr, np.zeros(8 - len(arr) % 8, dtype=np.uint8)])
 
-        byte_val = 0
-        for bit in byte_bits:
-            byte_val = (byte_val << 1) | bit
-
-        bytes_list.append(byte_val)
-
-    return bytes(bytes_list).decode('utf-8', errors='ignore')
+    return np.packbits(arr).tobytes().decode('utf-8', errors='ignore')
 
 
 def encrypt_text(A, t, bits, q, n, k, eta, ring, baby_kyber):
@@ -67,20 +57,15 @@ def encrypt_text(A, t, bits, q, n, k, eta, ring, baby_kyber):
     - ciphertext: list of ciphertext tuples (u, v)
     """
 
-    ciphertext = []
-    for i in range(0, len(bits), n):
-        chunk = bits[i:i + n]
-
-        if len(chunk) < n:
-            chunk += [0] * (n - len(chunk))
+    padded = bits + [0] * (-len(bits) % n)
+    M = np.asarray(padded, dtype=np.int64).reshape(-1, n)
 
-        c = BabyKyber.encrypt(baby_kyber, A, t, chunk, q, n, k, eta, ring)
-        ciphertext.append(c)
+    U, V = baby_kyber.encrypt_batch(A, t, M)
 
-    return ciphertext
+    return [(U[i], V[i]) for i in range(len(M))]
 
 
-def decrypt_text(ciphertext, s, q, k, ring):
+def decrypt_text(ciphertext, s, q, k, ring, baby_kyber):
     """
     Decrypts a list of ciphertext tuples and reconstructs the original text.
 
@@ -90,6 +75,7 @@ def decrypt_text(ciphertext, s, q, k, ring):
     - q: modulus
     - k: matrix/vector dimension
     - ring: instance of RingPolynomOperations
+    - baby_kyber: instance of BabyKyber
 
     Returns:
     - text: the decrypted string recovered from the ciphertext
@@ -97,7 +83,7 @@ def decrypt_text(ciphertext, s, q, k, ring):
 
     bits = []
     for c in ciphertext:
-        decrypted_bits = BabyKyber.decrypt(c, s, q, k, ring)
+        decrypted_bits = BabyKyber.decrypt(baby_kyber, c, s, q, k, ring)
         bits.extend(decrypted_bits)
 
     return bits_to_text(bits)
@@ -141,7 +127,7 @@ def main():
     print(f"Ciphertext:\n\t{ciphertext}\n")
 
     # DECRYPTION
-    decrypted_message = decrypt_text(ciphertext, s, q, k, ring)
+    decrypted_message = decrypt_text(ciphertext, s, q, k, ring, baby_kyber)
 
     print("=" * 40)
     print("🔓  DECRYPTION")